@@ -0,0 +1,5 @@
+import os
+import sys
+
+# tracker.py è uno script, non un package: lo si importa dalla cartella scripts/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
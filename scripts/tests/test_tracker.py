@@ -0,0 +1,282 @@
+import json
+import sqlite3
+
+import feedparser
+import pytest
+import requests
+
+import tracker
+
+FEED_A = "https://a.example/feed"
+FEED_B = "https://b.example/feed"
+PUB = "Mon, 06 Jan 2025 10:00:00 GMT"
+PUB_LATER = "Tue, 07 Jan 2025 10:00:00 GMT"
+
+CONFIG = r"""
+feeds:
+  - { url: "https://a.example/feed" }
+  - { url: "https://b.example/feed" }
+must_match_any: ["(?i)laptop"]
+include_keywords_positive: ["(?i)thinkpad"]
+include_keywords_strong: ["(?i)windows\\s*12"]
+exclude_keywords: ["(?i)\\bdeal\\b"]
+trusted_hosts: []
+low_quality_hosts: []
+fetch_workers: 1
+cache_path: ".cache/tracker.sqlite"
+cache_ttl_days: 30
+"""
+
+SUMMARY = "Hands on with the business notebook display keyboard battery"
+
+
+def rss(*items):
+    # items: (title, link, pubDate[, description])
+    parts = []
+    for title, link, pub, *desc in items:
+        parts.append(f"<item><title>{title}</title><link>{link}</link>"
+                     f"<description>{desc[0] if desc else SUMMARY}</description>"
+                     f"<pubDate>{pub}</pubDate></item>")
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>{"".join(parts)}</channel></rss>'.encode()
+
+# ---------- parse_feed_fast vs feedparser
+
+RSS_SAMPLE = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/"
+     xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel><title>c</title><link>https://site.example/</link>
+<item><title>ThinkPad &amp; Windows 12</title><link>https://site.example/1</link>
+  <description>&lt;p&gt;New &lt;b&gt;laptop&lt;/b&gt; leak&lt;/p&gt;</description>
+  <pubDate>Mon, 06 Jan 2025 10:00:00 GMT</pubDate></item>
+<item><title>Guid only</title><guid>https://site.example/2</guid>
+  <description>plain</description><pubDate>2025-01-06T10:00:00+02:00</pubDate></item>
+<item><title>Content only</title><link>https://site.example/3</link>
+  <guid isPermaLink="false">abc-3</guid>
+  <content:encoded><![CDATA[<p>Full <i>body</i> text</p>]]></content:encoded>
+  <dc:date>2025-01-05T08:30:00Z</dc:date></item>
+<item><title>Relative</title><link>/news/4</link><description>d</description>
+  <pubDate>Sun, 05 Jan 2025 23:00:00 -0500</pubDate></item>
+</channel></rss>"""
+
+ATOM_SAMPLE = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xml:base="https://blog.example/base/">
+<title>t</title><id>urn:t</id><updated>2025-01-06T10:00:00Z</updated>
+<entry><title>Relative href</title><id>urn:1</id><link href="post/1"/>
+  <summary>short</summary><published>2025-01-06T10:00:00Z</published>
+  <updated>2025-01-07T10:00:00Z</updated></entry>
+<entry xml:base="/other/"><title>Entry base</title><id>urn:2</id>
+  <link rel="alternate" href="p2"/><link rel="enclosure" href="/file.mp3"/>
+  <content type="html">&lt;p&gt;content body&lt;/p&gt;</content>
+  <updated>2025-01-04T00:00:00+01:00</updated></entry>
+<entry><title type="html">Absolute &amp;amp; escaped</title><id>urn:3</id>
+  <link href="https://elsewhere.example/x"/><summary>s</summary>
+  <published>2025-01-03T12:00:00Z</published></entry>
+</feed>"""
+
+
+def comparable(e):
+    t = tracker.entry_time(e)
+    return (
+        e.get("title"),
+        e.get("link"),
+        tracker.normalize_text(e.get("summary") or e.get("description")),
+        tuple(t[:6]) if t else None,
+    )
+
+
+@pytest.mark.parametrize("body", [RSS_SAMPLE, ATOM_SAMPLE], ids=["rss", "atom"])
+def test_parse_feed_fast_matches_feedparser(body):
+    url = "https://feeds.example/path/feed.xml"
+    fast = tracker.parse_feed_fast(body, url)
+    # stessi argomenti del fallback in fetch_feed
+    slow = feedparser.parse(body, response_headers={"content-location": url},
+                            resolve_relative_uris=False, sanitize_html=False).entries
+    assert fast is not None
+    assert [comparable(e) for e in fast] == [comparable(e) for e in slow]
+
+
+@pytest.mark.parametrize("body", [b"<html><body/></html>", b"<rss><channel><item>", b""])
+def test_parse_feed_fast_defers_to_feedparser(body):
+    assert tracker.parse_feed_fast(body, FEED_A) is None
+
+# ---------- run() con HTTP e KeyBERT finti
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+
+class FakeSession:
+    """url -> (body, etag); risponde 304 se If-None-Match coincide con l'ETag."""
+
+    def __init__(self):
+        self.feeds = {}
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        headers = headers or {}
+        self.requests.append((url, dict(headers)))
+        body, etag = self.feeds.get(url, (rss(), None))
+        if etag and headers.get("If-None-Match") == etag:
+            return FakeResponse(304)
+        hdrs = {"Content-Type": "application/rss+xml"}
+        if etag:
+            hdrs["ETag"] = etag
+        return FakeResponse(200, body, hdrs)
+
+
+class StubModel:
+    def __init__(self):
+        self.fail = False
+        self.calls = 0
+
+    def extract_keywords(self, docs, top_n=5):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        kw = [[(d.split()[0].strip(".").lower(), 0.9)] for d in docs]
+        return kw[0] if len(docs) == 1 else kw  # come KeyBERT: lista piatta con un solo documento
+
+
+class Env:
+    def __init__(self, tmp_path, monkeypatch):
+        self.config = tmp_path / "config.yaml"
+        self.config.write_text(CONFIG, encoding="utf-8")
+        self.out = tmp_path / "news.json"
+        self.db_path = tmp_path / ".cache" / "tracker.sqlite"
+        self.session = FakeSession()
+        self.model = StubModel()
+        self.processed = []
+        process_entry = tracker.process_entry
+
+        def counting_process_entry(e, title, link, date_iso, cfg):
+            self.processed.append(link)
+            return process_entry(e, title, link, date_iso, cfg)
+
+        monkeypatch.setattr(tracker, "SESSION", self.session)
+        monkeypatch.setattr(tracker, "get_kw_model", lambda: self.model)
+        monkeypatch.setattr(tracker, "get_kw_stop_words", lambda: frozenset({"the", "with", "on", "new"}))
+        monkeypatch.setattr(tracker, "process_entry", counting_process_entry)
+
+    def run(self):
+        self.processed.clear()
+        self.model.calls = 0
+        self.session.requests.clear()
+        tracker.run(str(self.config), str(self.out))
+        return {it["link"]: it for it in json.loads(self.out.read_text(encoding="utf-8"))}
+
+    def db(self):
+        return sqlite3.connect(self.db_path)
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    return Env(tmp_path, monkeypatch)
+
+
+def test_cache_hit_skips_filters_and_keybert(env):
+    env.session.feeds[FEED_A] = (rss(("ThinkPad laptop", "https://news.example/1", PUB)), None)
+    first = env.run()
+    assert env.processed == ["https://news.example/1"]
+    assert env.model.calls == 1
+    assert first["https://news.example/1"]["keywords"] == ["thinkpad"]
+
+    second = env.run()
+    assert env.processed == []
+    assert env.model.calls == 0
+    assert second == first
+
+
+def test_304_replays_saved_body(env):
+    env.session.feeds[FEED_A] = (rss(("ThinkPad laptop", "https://news.example/1", PUB)), '"v1"')
+    first = env.run()
+
+    second = env.run()
+    sent = dict(env.session.requests)
+    assert sent[FEED_A] == {"If-None-Match": '"v1"'}
+    assert sent[FEED_B] == {}  # nessun ETag: nessun GET condizionale
+    assert second == first
+
+
+def test_feed_bodies_dropped_when_feed_removed_from_config(env):
+    env.session.feeds[FEED_A] = (rss(), '"a"')
+    env.session.feeds[FEED_B] = (rss(), '"b"')
+    env.run()
+    env.config.write_text(CONFIG.replace('  - { url: "https://b.example/feed" }\n', ""), encoding="utf-8")
+    env.run()
+    with env.db() as db:
+        assert [url for url, in db.execute("SELECT url FROM feeds")] == [FEED_A]
+
+
+def test_ttl_expires_links_no_longer_in_feeds(env):
+    kept, gone = "https://news.example/kept", "https://news.example/gone"
+    env.session.feeds[FEED_A] = (rss(("ThinkPad laptop", kept, PUB), ("Laptop deal", gone, PUB)), None)
+    env.run()
+    with env.db() as db:
+        db.execute("UPDATE seen SET last_seen = last_seen - 40 * 86400")
+
+    env.session.feeds[FEED_A] = (rss(("ThinkPad laptop", kept, PUB)), None)
+    env.run()
+    assert env.processed == []  # kept: cache hit, che rinnova last_seen
+    with env.db() as db:
+        rows = {h for h, in db.execute("SELECT link_hash FROM seen")}
+    assert rows == {tracker.SeenCache.key(kept)}
+
+
+def test_keybert_failure_is_not_cached(env):
+    env.session.feeds[FEED_A] = (rss(("ThinkPad laptop", "https://news.example/1", PUB)), None)
+    env.model.fail = True
+    assert env.run()["https://news.example/1"]["keywords"] == []
+
+    env.model.fail = False
+    assert env.run()["https://news.example/1"]["keywords"] == ["thinkpad"]
+    assert env.model.calls == 1
+
+# ---------- dedup per link: resta la migliore copia accettata
+
+
+def test_rejected_copy_does_not_shadow_accepted_one(env):
+    link = "https://news.example/dup"
+    env.session.feeds[FEED_A] = (rss(("Laptop deal", link, PUB)), None)
+    env.session.feeds[FEED_B] = (rss(("ThinkPad laptop", link, PUB)), None)
+    env.model.fail = True
+    item = env.run()[link]
+    assert (item["title"], item["score"]) == ("ThinkPad laptop", 2)
+
+    # KeyBERT fallito: in cache non va né l'item né lo scarto della prima copia
+    env.model.fail = False
+    assert env.run()[link]["keywords"] == ["thinkpad"]
+
+    # ora in cache c'è l'item accettato
+    assert env.run()[link]["title"] == "ThinkPad laptop"
+    assert env.processed == []
+
+
+def test_best_copy_wins_and_max_score_copies_short_circuit(env):
+    link = "https://news.example/dup"
+    env.session.feeds[FEED_A] = (rss(("Laptop teaser", link, PUB)), None)
+    env.session.feeds[FEED_B] = (rss(("Windows 12 laptop", link, PUB),
+                                      ("Windows 12 laptop again", link, PUB)), None)
+    item = env.run()[link]
+    assert (item["title"], item["score"]) == ("Windows 12 laptop", 3)
+    # la terza copia (score massimo già raggiunto, data non più recente) non passa dai filtri
+    assert env.processed == [link, link]
+
+
+def test_tie_keeps_first_copy_and_later_date_wins(env):
+    link = "https://news.example/dup"
+    env.session.feeds[FEED_A] = (rss(("ThinkPad laptop first", link, PUB)), None)
+    env.session.feeds[FEED_B] = (rss(("ThinkPad laptop second", link, PUB)), None)
+    assert env.run()[link]["title"] == "ThinkPad laptop first"
+
+    env.session.feeds[FEED_B] = (rss(("ThinkPad laptop newer", link, PUB_LATER)), None)
+    env.db_path.unlink()
+    item = env.run()[link]
+    assert (item["title"], item["date"]) == ("ThinkPad laptop newer", "2025-01-07T10:00:00Z")
@@ -10,186 +10,656 @@ Notebook 2026 — Tracker (Fase 1 pre-CES)
 Output: public/news.json
 """
 
+import io
+import os
 import re
 import sys
-import json
 import time
+import sqlite3
 import yaml
 import hashlib
 import argparse
 import datetime as dt
-from urllib.parse import urlparse
+from html import unescape
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_tz, mktime_tz
+from typing import List, NamedTuple
+from functools import lru_cache
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
 
 import feedparser
-from keybert import KeyBERT
-from sentence_transformers import SentenceTransformer
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    # orjson (C/Rust) se presente; fallback stdlib con output identico (indent=2, UTF-8 non escaped)
+    import orjson
+
+    def json_dumps(obj, indent: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    json_loads = orjson.loads
+except ImportError:
+    import json
+
+    def json_dumps(obj, indent: bool = False) -> bytes:
+        if indent:
+            return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    json_loads = json.loads
+
+try:
+    # opzionale (google-re2): automa lineare, niente backtracking catastrofico sui pattern del config
+    import re2
+except ImportError:
+    re2 = None
 
 # ---------- Helpers
 
 DATE_FMT = "%Y-%m-%dT%H:%M:%S%z"
-
+ISO_FMT = "%Y-%m-%dT%H:%M:%SZ"
+
+class Item(NamedTuple):
+    # record compatto (tupla, niente __dict__ per istanza) per le entry che passano i filtri
+    date: str
+    score: int
+    title: str
+    link: str
+    host: str
+    keywords: List[str]
+    cluster_id: int
+
+    def to_json(self) -> dict:
+        return {
+            "date": self.date,
+            "score": self.score,
+            "title": self.title,
+            "link": self.link,
+            # opzionali per debug/estensioni future:
+            "keywords": self.keywords,
+            "cluster_id": self.cluster_id
+        }
+
+def sort_items(items):
+    # score desc, host asc, data desc. Le date ISO "…Z" a larghezza fissa si ordinano già come
+    # stringhe: due sort stabili (prima la chiave secondaria) evitano di convertire la data in
+    # intero a ogni confronto
+    items = sorted(items, key=attrgetter("date"), reverse=True)
+    items.sort(key=lambda it: (-it.score, it.host))
+    return items
+
+@lru_cache(maxsize=4096)
 def norm_host(url: str) -> str:
     try:
         h = urlparse(url).hostname or ""
-        return re.sub(r"^www\.", "", h)
-    except Exception:
+    except ValueError:
         return ""
+    return h[4:] if h.startswith("www.") else h
 
-def iso_date(entry) -> str:
-    # prefer published_parsed, altrimenti oggi in UTC
-    try:
-        t = entry.get("published_parsed") or entry.get("updated_parsed")
-        if t:
-            return time.strftime("%Y-%m-%dT%H:%M:%SZ", t)
-    except Exception:
-        pass
-    return dt.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+def entry_time(entry):
+    # struct_time UTC (published, altrimenti updated) o None
+    return entry.get("published_parsed") or entry.get("updated_parsed")
+
+def iso_date(t, default: str) -> str:
+    # struct_time → ISO UTC, altrimenti default (ora UTC di avvio del run, calcolata una volta)
+    if t:
+        try:
+            return time.strftime(ISO_FMT, t)
+        except (TypeError, ValueError):
+            pass
+    return default
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+_TRANS = str.maketrans({"×": "x"})
+
+def normalize_text(s: str) -> str:
+    # summary RSS/Atom → testo: via markup ed entità prima di regex e KeyBERT
+    s = unescape(s or "")
+    s = _TAG_RE.sub(" ", s)
+    s = s.translate(_TRANS)
+    return _WS_RE.sub(" ", s).strip()
+
+# una sola scansione per (…), cifre e spazi: una sequenza di questi token diventa " " se
+# contiene spazi fuori dalle parentesi (gruppo 1), altrimenti sparisce
+_CLUSTER_RE = re.compile(r"(?:\([^)]*\)|\d+|(\s))+")
+
+def cluster_norm(title: str) -> str:
+    # titolo senza (…) e numeri, spazi compattati: stessa chiave di cluster delle 3 re.sub in sequenza
+    return _CLUSTER_RE.sub(lambda m: " " if m.group(1) else "", title.lower()).strip()
 
 def sha_id(s: str) -> str:
-    return hashlib.sha1(s.encode("utf-8")).hexdigest()[:12]
+    # blake2b con digest da 6 byte = esattamente 12 caratteri hex, senza SHA-1 completo + slice
+    return hashlib.blake2b(s.encode("utf-8"), digest_size=6).hexdigest()
+
+def cluster_hash(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "big") % 100000
 
 def clamp_score(n: int) -> int:
     return 3 if n >= 3 else 2 if n == 2 else 1
 
 def looks_like_url(s: str) -> bool:
-    return bool(re.match(r"^https?://", s or ""))
+    return (s or "").startswith(("http://", "https://"))
+
+# ---------- Feed parsing
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+DC_DATE = "{http://purl.org/dc/elements/1.1/}date"
+CONTENT_ENCODED = "{http://purl.org/rss/1.0/modules/content/}encoded"
+XML_BASE = "{http://www.w3.org/XML/1998/namespace}base"
+
+def xml_text(el) -> str:
+    return "".join(el.itertext()) if el is not None else ""
+
+def rfc822_parsed(s):
+    # anni strani (0, 99999, ...) fanno fallire mktime_tz/gmtime: data assente, non feed perso
+    try:
+        t = parsedate_tz(s or "")
+        return time.gmtime(mktime_tz(t)) if t else None
+    except (OverflowError, ValueError, OSError):
+        return None
+
+def iso8601_parsed(s):
+    try:
+        return dt.datetime.fromisoformat((s or "").strip().replace("Z", "+00:00")).utctimetuple()
+    except (OverflowError, ValueError):
+        return None
+
+def resolve_href(base: str, href: str) -> str:
+    # come feedparser: link relativi risolti contro xml:base / URL del feed
+    return urljoin(base, href.strip()) if href else ""
+
+def rss_link(el) -> str:
+    # <link> è opzionale in RSS 2.0: come feedparser si ripiega sul <guid> se è un permalink
+    # (isPermaLink="true" è il default)
+    link = el.findtext("link")
+    if link:
+        return link
+    guid = el.find("guid")
+    if guid is not None and guid.get("isPermaLink", "true").lower() != "false":
+        return guid.text or ""
+    return ""
+
+def rss_entry(el, base: str) -> dict:
+    # pubDate non sempre è RFC 822: molti feed ci mettono ISO 8601
+    pub = el.findtext("pubDate")
+    # senza <description> feedparser usa <content:encoded> come summary
+    summary = el.find("description")
+    return {
+        "title": xml_text(el.find("title")),
+        "link": resolve_href(urljoin(base, el.get(XML_BASE, "")), rss_link(el)),
+        "summary": xml_text(summary if summary is not None else el.find(CONTENT_ENCODED)),
+        "published_parsed": rfc822_parsed(pub) or iso8601_parsed(pub) or iso8601_parsed(el.findtext(DC_DATE)),
+    }
+
+def atom_entry(el, base: str) -> dict:
+    # xml:base può stare su feed, entry e sul singolo <link>: si compongono in quest'ordine
+    base = urljoin(base, el.get(XML_BASE, ""))
+    link = ""
+    for l in el.findall(ATOM + "link"):
+        if l.get("rel", "alternate") == "alternate":
+            link = resolve_href(urljoin(base, l.get(XML_BASE, "")), l.get("href"))
+            break
+    summary = el.find(ATOM + "summary")
+    return {
+        "title": xml_text(el.find(ATOM + "title")),
+        "link": link,
+        "summary": xml_text(summary if summary is not None else el.find(ATOM + "content")),
+        "published_parsed": iso8601_parsed(el.findtext(ATOM + "published")),
+        "updated_parsed": iso8601_parsed(el.findtext(ATOM + "updated")),
+    }
+
+def parse_feed_fast(body: bytes, url: str = ""):
+    # RSS 2.0 / Atom con ElementTree (parser C), leggendo solo i campi usati dal tracker.
+    # iterparse: ogni item viene estratto alla chiusura e poi svuotato (clear), così l'albero
+    # non trattiene tutto il feed in memoria.
+    # None = formato non riconosciuto o XML malformato → si passa a feedparser (più tollerante)
+    entries = []
+    tag = build = base = None
+    try:
+        for event, el in ET.iterparse(io.BytesIO(body), events=("start", "end")):
+            if tag is None:
+                # primo elemento = radice: decide il formato e la base per i link relativi
+                base = urljoin(url, el.get(XML_BASE, ""))
+                if el.tag == "rss":
+                    tag, build = "item", rss_entry
+                elif el.tag == ATOM + "feed":
+                    tag, build = ATOM + "entry", atom_entry
+                else:
+                    return None
+            elif event == "end" and el.tag == tag:
+                entries.append(build(el, base))
+                el.clear()
+    except ET.ParseError:
+        return None
+    return entries if tag else None
+
+# ---------- HTTP
+
+TIMEOUT = 20
+FETCH_WORKERS = 8
+HEADERS = {"User-Agent": "notebook-2026-tracker/1.0 (+https://github.com/tomauspsi/notebook-2026)"}
+
+# sessione unica keep-alive: i feed sullo stesso host riusano la connessione TCP/TLS
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+))
+
+def fetch_feed(url: str, cached=None):
+    # cached = (etag, last_modified, content_type, body) del run precedente → GET condizionale.
+    # Ritorna (entries, fresh): fresh è la nuova tupla da salvare, None se il server ha risposto 304
+    hdrs = {}
+    if cached:
+        if cached[0]:
+            hdrs["If-None-Match"] = cached[0]
+        if cached[1]:
+            hdrs["If-Modified-Since"] = cached[1]
+    r = SESSION.get(url, headers=hdrs, timeout=TIMEOUT)
+    if r.status_code == 304 and cached:
+        # feed invariato: zero byte scaricati, si riparte dal body salvato
+        body, content_type, fresh = cached[3], cached[2], None
+    else:
+        r.raise_for_status()
+        body, content_type = r.content, r.headers.get("Content-Type")
+        fresh = (r.headers.get("ETag"), r.headers.get("Last-Modified"), content_type, body)
+
+    entries = parse_feed_fast(body, url)
+    if entries is None:
+        # feedparser cerca gli header in minuscolo (content-type per l'encoding,
+        # content-location come base dei link relativi, come nel fast path)
+        headers = {"content-location": url}
+        if content_type:
+            headers["content-type"] = content_type
+        # niente sanitizer HTML né risoluzione URI relative: i summary passano da normalize_text
+        entries = feedparser.parse(body, response_headers=headers,
+                                   resolve_relative_uris=False, sanitize_html=False).entries
+    return entries, fresh
+
+def fetch_all(feeds, workers: int = FETCH_WORKERS, validators=None):
+    # download concorrente (I/O bound); filtri, scoring e KeyBERT restano seriali
+    validators = validators or {}
+
+    def fetch_one(feed):
+        try:
+            entries, fresh = fetch_feed(feed["url"], validators.get(feed["url"]))
+            return feed, entries, fresh
+        except Exception as e:
+            print(f"[warn] feed error {feed['url']}: {e}", file=sys.stderr)
+            return feed, None, None
+
+    if not feeds:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(feeds)))) as ex:
+        return list(ex.map(fetch_one, feeds))
+
+# ---------- Cache entry già viste (tra un run e l'altro)
+
+CACHE_VERSION = 5  # da incrementare quando cambia la logica di filtri/score/keyword
+CACHE_SCHEMA = 2   # da incrementare quando cambiano le tabelle (la tabella seen viene ricreata)
+CACHE_TTL_DAYS = 30
+CACHE_CFG_KEYS = ("must_match_any", "include_keywords_positive", "include_keywords_strong",
+                  "exclude_keywords", "trusted_hosts", "low_quality_hosts")
+
+def config_fingerprint(cfg: dict) -> str:
+    # l'esito cache vale solo finché non cambiano le regole che lo hanno prodotto
+    rules = {k: cfg.get(k) for k in CACHE_CFG_KEYS}
+    return sha_id(f"{CACHE_VERSION}:" + json_dumps(rules).decode("utf-8"))
+
+class SeenCache:
+    """SQLite link -> esito della pipeline (Item, o NULL se scartata), per fingerprint di config.
+    Tiene anche ETag/Last-Modified e ultimo body di ogni feed per i GET condizionali.
+    last_seen (epoch) si aggiorna a ogni get/put: i link spariti dai feed scadono dopo ttl_days."""
+
+    def __init__(self, path: str, cfg_hash: str, ttl_days: int = CACHE_TTL_DAYS):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.cfg_hash = cfg_hash
+        self.now = int(time.time())
+        self.ttl = ttl_days * 86400
+        self.db = sqlite3.connect(path)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != CACHE_SCHEMA:
+            self.db.execute("DROP TABLE IF EXISTS seen")
+            self.db.execute(f"PRAGMA user_version = {CACHE_SCHEMA}")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            " link_hash BLOB PRIMARY KEY, cfg TEXT, date TEXT, score INTEGER,"
+            " title TEXT, host TEXT, keywords TEXT, cluster_id INTEGER, last_seen INTEGER)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS feeds ("
+            " url TEXT PRIMARY KEY, etag TEXT, modified TEXT, content_type TEXT, body BLOB)"
+        )
+
+    @staticmethod
+    def key(link: str) -> bytes:
+        return hashlib.blake2s(link.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, link: str):
+        # (hit, item): item None = entry già scartata
+        row = self.db.execute(
+            "SELECT cfg, date, score, title, host, keywords, cluster_id FROM seen WHERE link_hash = ?",
+            (self.key(link),),
+        ).fetchone()
+        if row is None or row[0] != self.cfg_hash:
+            return False, None
+        self.db.execute("UPDATE seen SET last_seen = ? WHERE link_hash = ?", (self.now, self.key(link)))
+        if row[2] is None:
+            return True, None
+        return True, Item(row[1], row[2], row[3], link, row[4], json_loads(row[5]), row[6])
+
+    def put(self, link: str, item):
+        if item is None:
+            values = (self.key(link), self.cfg_hash, None, None, None, None, None, None, self.now)
+        else:
+            values = (self.key(link), self.cfg_hash, item.date, item.score, item.title,
+                      item.host, json_dumps(item.keywords).decode("utf-8"), item.cluster_id, self.now)
+        self.db.execute("INSERT OR REPLACE INTO seen VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", values)
+
+    def feed_validators(self) -> dict:
+        rows = self.db.execute("SELECT url, etag, modified, content_type, body FROM feeds")
+        return {url: (etag, modified, ctype, body) for url, etag, modified, ctype, body in rows}
+
+    def put_feed(self, url: str, fresh):
+        etag, modified, ctype, body = fresh
+        if not etag and not modified:
+            # senza validatori il server non potrà mai rispondere 304: inutile tenere il body
+            self.db.execute("DELETE FROM feeds WHERE url = ?", (url,))
+            return
+        self.db.execute("INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?, ?)", (url, etag, modified, ctype, body))
+
+    def close(self, feed_urls):
+        # righe prodotte con regole vecchie, o di link non più visti nei feed da ttl_days, non servono più
+        self.db.execute("DELETE FROM seen WHERE cfg != ? OR last_seen < ?", (self.cfg_hash, self.now - self.ttl))
+        # body salvati di feed tolti da config.yaml
+        urls = list(feed_urls)
+        self.db.execute(f"DELETE FROM feeds WHERE url NOT IN ({','.join('?' * len(urls))})", urls)
+        self.db.commit()
+        self.db.close()
 
 # ---------- Loading config
 
-def load_config(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f)
-    return cfg
+try:
+    # loader C (LibYAML) se PyYAML è compilato con il supporto, altrimenti quello puro Python
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
-# ---------- Scoring / filters
+_CFG_CACHE = {}
 
-def compile_patterns(patterns):
-    return [re.compile(p, re.IGNORECASE) for p in patterns]
+def load_config(path: str) -> dict:
+    # parse memoizzato per (path, mtime, size): run ripetuti nello stesso processo non riparsano
+    # il YAML, e una modifica al file invalida la entry
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    cfg = _CFG_CACHE.get(key)
+    if cfg is None:
+        with open(path, "r", encoding="utf-8") as f:
+            cfg = yaml.load(f, Loader=SafeLoader) or {}
+        _CFG_CACHE[key] = cfg
+    # copia: run() aggiunge al dict i bucket compilati
+    return dict(cfg)
 
-def any_match(text: str, regs) -> bool:
-    return any(r.search(text) for r in regs)
+# ---------- Scoring / filters
 
-def compute_score(title: str, summary: str, host: str, cfg: dict) -> int:
-    t = f"{title} {summary}".lower()
+class Bucket(NamedTuple):
+    # rx: re, semantica Unicode di riferimento. ascii_rx: stessa sorgente compilata con RE2
+    # (None se re2 manca o non supporta il pattern): \s \w \b \d di RE2 sono solo ASCII,
+    # quindi si usa solo su testo ASCII, dove coincide con re
+    rx: object
+    ascii_rx: object
 
-    score = 1
-    if any_match(t, cfg["_kw_positive"]):
-        score = 2
+def compile_patterns(patterns):
+    return compile_bucket(tuple(patterns or ()))
+
+@lru_cache(maxsize=64)
+def compile_bucket(patterns: tuple):
+    # un'unica alternanza per bucket: una sola scansione del motore regex invece di una per pattern.
+    # il (?i) dei singoli pattern va tolto (flag globale non ammesso dentro un gruppo) e rimesso in testa.
+    # memoizzata sulla tupla di sorgenti: lo stesso bucket non viene mai ricompilato.
+    # i testi arrivano già in minuscolo (vedi any_match): se il bucket non contiene maiuscole
+    # si compila case-sensitive, evitando il confronto case-folding carattere per carattere
+    if not patterns:
+        return None
+    parts = (re.sub(r"^\(\?i\)", "", p) for p in patterns)
+    body = "|".join(f"(?:{p})" for p in parts)
+    source = body if body == body.lower() else "(?i)" + body
+    ascii_rx = None
+    if re2 is not None:
+        try:
+            ascii_rx = re2.compile(source)
+        except re2.error:
+            pass  # backreference/lookaround non supportati da RE2: si resta su re
+    return Bucket(re.compile(source), ascii_rx)
+
+def any_match(text: str, bucket) -> bool:
+    # text deve essere già in minuscolo (host, blob dell'entry) e con gli spazi normalizzati
+    if bucket is None:
+        return False
+    rx = bucket.ascii_rx if bucket.ascii_rx is not None and text.isascii() else bucket.rx
+    return rx.search(text) is not None
+
+@lru_cache(maxsize=4096)
+def host_bonus(host: str, trusted, low) -> int:
+    # pochi host distinti per run: il risultato si memoizza (i Bucket compilati sono hashable)
+    bonus = 0
+    if any_match(host, trusted):
+        bonus += 1
+    if any_match(host, low):
+        bonus -= 1
+    return bonus
+
+def compute_score(t: str, host: str, cfg: dict) -> int:
+    # t: blob "titolo summary" già in minuscolo, costruito una volta in process_entry
+    # strong prima: se matcha, positive non cambierebbe nulla e non si scansiona
     if any_match(t, cfg["_kw_strong"]):
         score = 3
+    elif any_match(t, cfg["_kw_positive"]):
+        score = 2
+    else:
+        score = 1
 
-    if any_match(host, cfg["_host_trusted"]):
-        score += 1
-    if any_match(host, cfg["_host_low"]):
-        score -= 1
+    score += host_bonus(host, cfg["_host_trusted"], cfg["_host_low"])
 
     score = clamp_score(score)
     return score
 
-def extract_keywords_kwbert(model, text: str, topk: int = 5):
-    if not text:
-        return []
+KW_MODEL_NAME = "all-MiniLM-L6-v2"
+
+@lru_cache(maxsize=1)
+def get_kw_model():
+    # Keyword model (fast, CPU only): pesi caricati una sola volta per processo.
+    # import qui dentro: torch si inizializza solo se serve davvero
+    from keybert import KeyBERT
+    from sentence_transformers import SentenceTransformer
+    return KeyBERT(model=SentenceTransformer(KW_MODEL_NAME))
+
+@lru_cache(maxsize=1)
+def get_kw_stop_words():
+    # stesse stop word inglesi che il CountVectorizer di KeyBERT scarta (stop_words="english")
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    return ENGLISH_STOP_WORDS
+
+KW_MIN_TOKENS = 4
+_KW_TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")  # stesso token_pattern del CountVectorizer di KeyBERT
+
+def extract_keywords_kwbert(texts, topk: int = 5):
+    # una sola chiamata per tutti i documenti: KeyBERT vettorizza i candidati una volta
+    # e codifica documenti/parole in batch invece di un forward pass per entry.
+    # documenti banali (< KW_MIN_TOKENS token non stop word): le keyword sono i token stessi, niente BERT.
+    # None = KeyBERT fallito per quel documento (da non mettere in cache: si riprova al run dopo)
+    out = [None] * len(texts)
+    if not texts:
+        return out
+    stop = get_kw_stop_words()
+    docs, idx = [], []
+    for i, text in enumerate(texts):
+        tokens = [w for w in dict.fromkeys(_KW_TOKEN_RE.findall(text.lower())) if w not in stop]
+        if len(tokens) < KW_MIN_TOKENS:
+            out[i] = tokens[:topk]
+        else:
+            docs.append(text)
+            idx.append(i)
+    if not docs:
+        return out
+    # modello caricato solo qui, quando c'è davvero qualcosa da codificare:
+    # i run senza entry nuove (cache, feed 304, tutto filtrato) non pagano l'init di Torch
+    model = get_kw_model()
     try:
-        kw = model.extract_keywords(text, top_n=topk)
-        return [k for k, _ in kw]
+        kw = model.extract_keywords(docs, top_n=topk)
+        if len(docs) == 1:
+            kw = [kw]  # con un solo documento KeyBERT restituisce la lista piatta
     except Exception:
-        return []
+        return out
+    for i, doc_kw in zip(idx, kw):
+        out[i] = [k for k, _ in doc_kw]
+    return out
+
+# ---------- Pipeline per entry
+
+def process_entry(e, title: str, link: str, date_iso: str, cfg: dict):
+    # filtri + score + cluster; None se l'entry viene scartata, altrimenti (item, testo per KeyBERT).
+    # le keyword si calcolano dopo, in batch su tutte le entry nuove
+    summary = normalize_text(e.get("summary") or e.get("description"))
+
+    # prelim exclude (un solo lower() per entry, condiviso da exclude, gate e score).
+    # spazi normalizzati anche nel titolo: NBSP, thin space ecc. diventano " " per tutti i bucket
+    fulltext = _WS_RE.sub(" ", f"{title} {summary}".lower())
+    if any_match(fulltext, cfg["_kw_exclude"]):
+        return None
+
+    # hardware/OS gates (broad but targeted); il titolo è già dentro fulltext
+    gates_re = cfg["_gates"]
+    if gates_re is not None:
+        if not any_match(fulltext, gates_re):
+            # allow FCC/regulatory even senza gate hardware
+            if not any_match(fulltext, cfg["_kw_strong"]):
+                return None
+
+    # host solo per le entry sopravvissute ai filtri (serve allo score e all'ordinamento)
+    host = norm_host(link)
+    score = compute_score(fulltext, host, cfg)
+
+    text_for_kw = f"{title}. {summary}".strip()
+
+    # cluster (very naive: normalized title hash)
+    norm = cluster_norm(title)
+    cluster_id = cluster_hash(norm)
+
+    return Item(date_iso, score, title, link, host, [], cluster_id), text_for_kw
 
 # ---------- Main
 
-def run(config_path: str, out_json: str):
+def run(config_path: str, out_json: str, since_days=None):
     cfg = load_config(config_path)
 
+    # finestra temporale: cutoff calcolato una volta come tupla (Y, M, D, h, m, s) UTC,
+    # confrontata in C con i primi 6 campi dello struct_time dell'entry (nessun datetime per entry).
+    # () = nessun limite: ogni tupla è >= ()
+    now = dt.datetime.now(dt.timezone.utc)
+    now_iso = now.strftime(ISO_FMT)
+    if since_days is None:
+        since_days = cfg.get("since_days") or 0
+    cutoff = ()
+    if since_days > 0:
+        cutoff = (now - dt.timedelta(days=since_days)).timetuple()[:6]
+
     # compile regex buckets
     cfg["_kw_positive"]   = compile_patterns(cfg["include_keywords_positive"])
     cfg["_kw_strong"]     = compile_patterns(cfg["include_keywords_strong"])
     cfg["_kw_exclude"]    = compile_patterns(cfg["exclude_keywords"])
+    cfg["_gates"]         = compile_patterns(cfg.get("must_match_any"))
     cfg["_host_trusted"]  = compile_patterns(cfg["trusted_hosts"])
     cfg["_host_low"]      = compile_patterns(cfg["low_quality_hosts"])
 
     feeds = cfg["feeds"]
-    items = []
-
-    # Keyword model (fast, CPU only)
-    sbert = SentenceTransformer("all-MiniLM-L6-v2")
-    kw_model = KeyBERT(model=sbert)
-
-    for feed in feeds:
-        url = feed["url"]
-        tag = feed.get("tag", "")
-        try:
-            parsed = feedparser.parse(url)
-        except Exception as e:
-            print(f"[warn] feed error {url}: {e}", file=sys.stderr)
+    best = {}
+    pending = {}      # link -> testo per KeyBERT, solo per le entry non in cache
+    resolved = set()  # link risolti dalla cache in questo run: le altre copie non servono
+    rejected = set()  # link con almeno una copia scartata dai filtri
+    cache_path = cfg.get("cache_path") or ":memory:"
+    if cache_path != ":memory:" and not os.path.isabs(cache_path):
+        # relativo al config: stesso file sia da root (--config scripts/config.yaml) sia da scripts/
+        cache_path = os.path.join(os.path.dirname(os.path.abspath(config_path)), cache_path)
+    cache = SeenCache(cache_path, config_fingerprint(cfg),
+                      cfg.get("cache_ttl_days", CACHE_TTL_DAYS))
+
+    fetched = fetch_all(feeds, cfg.get("fetch_workers", FETCH_WORKERS), cache.feed_validators())
+    for feed, entries, fresh in fetched:
+        if entries is None:
             continue
+        if fresh is not None:
+            cache.put_feed(feed["url"], fresh)
 
-        for e in parsed.entries:
+        for e in entries:
             title = (e.get("title") or "").strip()
-            summary = (e.get("summary") or e.get("description") or "").strip()
             link = (e.get("link") or "").strip()
-            host = norm_host(link)
-            date_iso = iso_date(e)
 
             if not title or not looks_like_url(link):
                 continue
 
-            # prelim exclude
-            fulltext = f"{title} {summary}"
-            if any_match(fulltext, cfg["_kw_exclude"]):
+            t = entry_time(e)
+            if t and tuple(t[:6]) < cutoff:
+                continue
+
+            if link in resolved:
+                continue
+            date_iso = iso_date(t, now_iso)
+
+            # copia di un link già al massimo (score 3) e non più recente: non potrebbe
+            # sostituirlo, quindi niente filtri, regex né KeyBERT
+            prev = best.get(link)
+            if prev is not None and prev.score >= 3 and date_iso <= prev.date:
                 continue
 
-            # hardware/OS gates (broad but targeted)
-            gates = cfg["must_match_any"]
-            if gates:
-                gates_re = compile_patterns(gates)
-                if not any_match(fulltext, gates_re) and not any_match(title, gates_re):
-                    # allow FCC/regulatory even senza gate hardware
-                    if not any_match(fulltext, cfg["_kw_strong"]):
-                        continue
-
-            score = compute_score(title, summary, host, cfg)
-
-            # keywords (KeyBERT)
-            text_for_kw = f"{title}. {summary}".strip()
-            keywords = extract_keywords_kwbert(kw_model, text_for_kw, topk=5)
-
-            # cluster (very naive: normalized title hash)
-            norm = re.sub(r"\([^)]*\)", "", title.lower())
-            norm = re.sub(r"\d+", "", norm)
-            norm = re.sub(r"\s+", " ", norm).strip()
-            cluster_id = int(sha_id(norm), 16) % 100000
-
-            items.append({
-                "id": sha_id(link),
-                "date": date_iso,
-                "score": score,
-                "title": title,
-                "link": link,
-                "host": host,
-                "keywords": keywords,
-                "cluster_id": cluster_id,
-                "tag": tag
-            })
-
-    # sort & unique by link
-    seen = set()
-    result = []
-    for it in sorted(items, key=lambda x: ( -x["score"], x["host"], -int(x["date"].replace("-","").replace(":","").replace("T","").replace("Z","") or "0") )):
-        if it["link"] in seen:
+            if link not in best and link not in rejected:
+                # prima copia del link in questo run: esito del run precedente (stesso config),
+                # già calcolato su tutte le copie di allora → niente filtri né KeyBERT
+                hit, item = cache.get(link)
+                if hit:
+                    resolved.add(link)
+                    if item is not None:
+                        best[link] = item
+                    continue
+
+            # le copie dello stesso link (frequenti tra aggregatori) possono avere summary diversi:
+            # ognuna passa i filtri e resta la migliore accettata (score, poi data più recente);
+            # a parità resta la prima. KeyBERT gira dopo, solo sulla copia vincente
+            res = process_entry(e, title, link, date_iso, cfg)
+            if res is None:
+                rejected.add(link)
+                continue
+            item, kw_text = res
+            if prev is None or (item.score, item.date) > (prev.score, prev.date):
+                best[link] = item
+                pending[link] = kw_text
+
+    # scarto in cache solo se nessuna copia del link è stata accettata
+    for link in rejected.difference(best):
+        cache.put(link, None)
+
+    # keywords (KeyBERT) in batch sulle sole entry nuove; poi in cache con le keyword.
+    # se KeyBERT fallisce l'item esce senza keyword e non va in cache, così il run dopo riprova
+    links = list(pending)
+    for link, keywords in zip(links, extract_keywords_kwbert([pending[l] for l in links], topk=5)):
+        if keywords is None:
             continue
-        seen.add(it["link"])
-        result.append({
-            "date": it["date"],
-            "score": it["score"],
-            "title": it["title"],
-            "link": it["link"],
-            # opzionali per debug/estensioni future:
-            "keywords": it["keywords"],
-            "cluster_id": it["cluster_id"]
-        })
+        best[link] = best[link]._replace(keywords=keywords)
+        cache.put(link, best[link])
+
+    cache.close(feed["url"] for feed in feeds)
+
+    result = [it.to_json() for it in sort_items(best.values())]
 
-    with open(out_json, "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    with open(out_json, "wb") as f:
+        f.write(json_dumps(result, indent=True))
 
     print(f"[ok] wrote {out_json} ({len(result)} items)")
 
@@ -197,5 +667,7 @@ if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", default="config.yaml")
     ap.add_argument("--out", default="public/news.json")
+    ap.add_argument("--since-days", type=int, default=None,
+                    help="tieni solo le news degli ultimi N giorni (default: since_days del config, 0 = tutte)")
     args = ap.parse_args()
-    run(args.config, args.out)
+    run(args.config, args.out, args.since_days)